@@ -5,11 +5,14 @@ MongoDB helper functions ready to use in your backend code.
 Import and use these functions in your API endpoints for database operations.
 """
 
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
+import asyncio
 from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
-from typing import Union
+from typing import Dict, Tuple, Union
 from pydantic import BaseModel
 
 # Load environment variables from .env file
@@ -22,15 +25,23 @@ database_url = os.getenv("DATABASE_URL")
 database_name = os.getenv("DATABASE_NAME")
 
 if database_url and database_name:
-    _client = MongoClient(database_url)
+    # One shared client per process; the pool is reused by every request
+    _client = AsyncIOMotorClient(
+        database_url,
+        maxPoolSize=50,
+        minPoolSize=5,
+        serverSelectionTimeoutMS=3000,
+    )
     db = _client[database_name]
 
-# Helper functions for common database operations
-def create_document(collection_name: str, data: Union[BaseModel, dict]):
-    """Insert a single document with timestamp"""
-    if db is None:
-        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+# Batched inserts: documents arriving within the window share one insert_many
+_BATCH_MAX_SIZE = 50
+_BATCH_WINDOW_S = 0.01
+_BATCH_RESULT_TIMEOUT_S = 10
+# collection name -> (event loop, queue, worker task); queues are only valid on their own loop
+_batch_writers: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Queue, asyncio.Task]] = {}
 
+def _prepare_document(data: Union[BaseModel, dict]) -> dict:
     # Convert Pydantic model to dict if needed
     if isinstance(data, BaseModel):
         data_dict = data.model_dump()
@@ -39,17 +50,167 @@ def create_document(collection_name: str, data: Union[BaseModel, dict]):
 
     data_dict['created_at'] = datetime.now(timezone.utc)
     data_dict['updated_at'] = datetime.now(timezone.utc)
+    return data_dict
+
+# Helper functions for common database operations
+async def create_document(collection_name: str, data: Union[BaseModel, dict]):
+    """Insert a single document with timestamp"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
 
-    result = db[collection_name].insert_one(data_dict)
+    result = await db[collection_name].insert_one(_prepare_document(data))
     return str(result.inserted_id)
 
-def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
-    """Get documents from collection"""
+async def create_document_batched(collection_name: str, data: Union[BaseModel, dict]):
+    """Insert a single document with timestamp, coalesced with concurrent inserts into one insert_many"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    queue = _batch_queue(collection_name)
+    future = asyncio.get_running_loop().create_future()
+    queue.put_nowait((_prepare_document(data), future))
+    try:
+        return await asyncio.wait_for(future, _BATCH_RESULT_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        # The write may still land later; the caller just stops waiting for it
+        raise Exception(f"Timed out waiting for {collection_name} insert")
+
+async def stop_batch_writers():
+    """Cancel the batch insert workers and fail any inserts still queued"""
+    loop = asyncio.get_running_loop()
+    writers = list(_batch_writers.values())
+    _batch_writers.clear()
+    for writer_loop, queue, task in writers:
+        if writer_loop is not loop:
+            continue
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        while not queue.empty():
+            _, future = queue.get_nowait()
+            if not future.done():
+                future.set_exception(Exception("Batch writer stopped"))
+
+def _batch_queue(collection_name: str) -> asyncio.Queue:
+    # Reuse the writer for this loop while its worker is alive; otherwise (re)start one
+    loop = asyncio.get_running_loop()
+    writer = _batch_writers.get(collection_name)
+    if writer is not None and writer[0] is loop:
+        queue, task = writer[1], writer[2]
+        if not task.done():
+            return queue
+    else:
+        queue = asyncio.Queue()
+    task = loop.create_task(_batch_insert_worker(collection_name, queue))
+    _batch_writers[collection_name] = (loop, queue, task)
+    return queue
+
+async def _batch_insert_worker(collection_name: str, queue: asyncio.Queue):
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        try:
+            deadline = loop.time() + _BATCH_WINDOW_S
+            while len(batch) < _BATCH_MAX_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await _flush_batch(collection_name, batch)
+        except asyncio.CancelledError:
+            _fail_batch(batch, Exception("Batch writer stopped"))
+            raise
+        except Exception as e:
+            # One bad batch must not take the worker down with it
+            _fail_batch(batch, e)
+
+async def _flush_batch(collection_name: str, batch: list):
+    # Skip inserts whose caller already timed out; they were told the write failed
+    batch = [(doc, future) for doc, future in batch if not future.done()]
+    if not batch:
+        return
+
+    # insert_many sets _id on each document in place, including on partial failure
+    failed: Dict[int, Exception] = {}
+    try:
+        await db[collection_name].insert_many([doc for doc, _ in batch], ordered=False)
+    except BulkWriteError as e:
+        for err in e.details.get("writeErrors", []):
+            failed[err["index"]] = Exception(err.get("errmsg", "Write failed"))
+
+    for i, (doc, future) in enumerate(batch):
+        if future.done():
+            continue
+        if i in failed:
+            future.set_exception(failed[i])
+        else:
+            future.set_result(str(doc["_id"]))
+
+def _fail_batch(batch: list, error: Exception):
+    for _, future in batch:
+        if not future.done():
+            future.set_exception(error)
+
+async def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None, projection: dict = None):
+    """Get documents from collection, optionally returning only the projected fields"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
     
-    cursor = db[collection_name].find(filter_dict or {})
+    cursor = db[collection_name].find(filter_dict or {}, projection)
     if limit:
         cursor = cursor.limit(limit)
     
-    return list(cursor)
+    return await cursor.to_list(length=limit)
+
+def _with_id_pipeline(filter_dict: dict = None, limit: int = None) -> list:
+    pipeline = [{"$match": filter_dict or {}}]
+    if limit:
+        pipeline.append({"$limit": limit})
+    pipeline.append({"$addFields": {"id": {"$toString": "$_id"}}})
+    pipeline.append({"$project": {"_id": 0}})
+    return pipeline
+
+async def get_documents_with_id(collection_name: str, filter_dict: dict = None, limit: int = None):
+    """Get documents with _id replaced by its string form under "id", converted server-side"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    cursor = db[collection_name].aggregate(_with_id_pipeline(filter_dict, limit))
+    return await cursor.to_list(length=limit)
+
+def stream_documents_with_id(collection_name: str, filter_dict: dict = None, limit: int = None):
+    """Like get_documents_with_id, but return the cursor so documents can be consumed one at a time"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    return db[collection_name].aggregate(_with_id_pipeline(filter_dict, limit))
+
+async def get_documents_per_value(collection_name: str, field: str, values: list, per_value: int, projection: dict = None):
+    """Get up to per_value documents for each value of field, in one round-trip, as {value: [docs]}"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    pipeline = [{"$match": {field: {"$in": values}}}]
+    if projection:
+        pipeline.append({"$project": projection})
+    # Facet names can't be arbitrary values, so key each branch by position
+    pipeline.append({"$facet": {
+        f"v{i}": [{"$match": {field: value}}, {"$limit": per_value}]
+        for i, value in enumerate(values)
+    }})
+    result = await db[collection_name].aggregate(pipeline).to_list(length=1)
+    facets = result[0] if result else {}
+    return {value: facets.get(f"v{i}", []) for i, value in enumerate(values)}
+
+async def get_documents_in(collection_name: str, ids: list, projection: dict = None):
+    """Get all documents whose _id is in ids with a single query"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    cursor = db[collection_name].find({"_id": {"$in": [ObjectId(i) for i in ids]}}, projection)
+    return await cursor.to_list(length=len(ids))
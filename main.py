@@ -1,19 +1,30 @@
 import os
+import bisect
+import re
+import time
+from functools import lru_cache, partial
+from itertools import zip_longest
+import ahocorasick
+import orjson
+from cachetools import TTLCache
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from typing import List, Optional, Dict, Any
 from bson import ObjectId
+from pymongo.errors import ServerSelectionTimeoutError
 
 from schemas import (
     Product,
     Customization,
+    Measurement,
     Order,
     ChatRequest,
     RecommendationRequest,
 )
-from database import db, create_document, get_documents
+from database import db, create_document_batched, stop_batch_writers, get_documents, get_documents_with_id, get_documents_per_value, stream_documents_with_id
 
-app = FastAPI(title="Vintage Clothier API", version="1.0.0")
+app = FastAPI(title="Vintage Clothier API", version="1.0.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,129 +35,253 @@ app.add_middleware(
 )
 
 
+# Outcome of the startup index build, reported by /test
+_INDEX_STATUS: Dict[str, str] = {"status": "Not Created"}
+
+
+@app.on_event("startup")
+async def create_indexes():
+    # Category filters back /products and /recommendations; _id is indexed by default
+    if db is None:
+        return
+    try:
+        await db["product"].create_index("category")
+        await db["order"].create_index("status")
+        _INDEX_STATUS["status"] = "✅ Created"
+    except ServerSelectionTimeoutError:
+        # Don't block startup if the database is unreachable; /test reports the connection
+        _INDEX_STATUS["status"] = "⚠️  Skipped: database unreachable"
+    except Exception as e:
+        _INDEX_STATUS["status"] = f"❌ Error: {str(e)[:50]}"
+
+
+@app.on_event("shutdown")
+async def stop_writers():
+    await stop_batch_writers()
+
+
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Vintage Clothier API running"}
 
 
+# Schemas are static for the lifetime of the process, so build them once
+_SCHEMA_CACHE = {
+    "models": {
+        "product": Product.model_json_schema(),
+        "customization": Customization.model_json_schema(),
+        "order": Order.model_json_schema(),
+    }
+}
+
+
 @app.get("/schema")
-def get_schema():
+async def get_schema():
     # Expose minimal schema metadata for viewer tools
-    from schemas import (
-        Product,
-        Customization,
-        Order,
-    )
-    return {
-        "models": {
-            "product": Product.model_json_schema(),
-            "customization": Customization.model_json_schema(),
-            "order": Order.model_json_schema(),
-        }
-    }
+    return _SCHEMA_CACHE
 
 
 # ---------------------- Products ----------------------
+_MAX_PRODUCTS_LIMIT = 500
+
 @app.post("/products")
-def create_product(product: Product):
+async def create_product(product: Product):
     try:
-        _id = create_document("product", product)
+        _id = await create_document_batched("product", product)
+        _REC_CACHE.clear()
         return {"id": _id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/products")
-def list_products(category: Optional[str] = Query(None), limit: int = Query(50)):
+async def list_products(
+    category: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=_MAX_PRODUCTS_LIMIT),
+):
     try:
         filt: Dict[str, Any] = {}
         if category:
             filt["category"] = category
-        items = get_documents("product", filt, limit)
-        for it in items:
-            it["id"] = str(it.pop("_id")) if "_id" in it else None
-        return {"items": items}
+        cursor = stream_documents_with_id("product", filt, limit)
+        # Pull the first document up front so database errors still surface as a 500
+        try:
+            first = await cursor.next()
+        except StopAsyncIteration:
+            return {"items": []}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(_stream_items(first, cursor), media_type="application/json")
+
+
+async def _stream_items(first: dict, cursor):
+    # Emit {"items": [...]} one encoded document at a time
+    yield b'{"items":[' + orjson.dumps(first)
+    async for doc in cursor:
+        yield b"," + orjson.dumps(doc)
+    yield b"]}"
 
 
 # ---------------------- Customization ----------------------
+# Defaults based on category if missing
+_DEFAULTS = {
+    "suit": {"fit": "tailored", "fabric": "worsted wool", "color": "navy", "pattern": "solid"},
+    "boots": {"color": "oxblood", "fabric": "full-grain leather", "fit": "regular"},
+    "shoes": {"color": "chestnut", "fabric": "calf leather", "fit": "regular"},
+    "hat": {"color": "charcoal", "fabric": "felt", "pattern": "solid"},
+    "belt": {"color": "dark brown", "fabric": "leather"},
+    "shirt": {"color": "white", "fabric": "oxford", "fit": "slim"},
+    "trousers": {"color": "charcoal", "fabric": "wool", "fit": "classic"},
+}
+_OPTION_KEYS = ("color", "fabric", "size", "fit", "pattern")
+# In priority order: when a fabric names several, the earliest entry here wins
+_FAB_MULT = {"cashmere": 0.6, "wool": 0.25, "leather": 0.35, "linen": 0.15}
+_FAB_RE = re.compile("|".join(_FAB_MULT))
+_FAB_PRIORITY = {kw: i for i, kw in enumerate(_FAB_MULT)}
+_PATTERN_SET = frozenset({"pinstripe", "herringbone", "houndstooth"})
+_FIT_SET = frozenset({"tailored", "slim"})
+# Upper chest bound (cm, exclusive) for each size; anything above the last is XL
+_CHEST_CUTS = (90, 96, 102, 110)
+_SIZES = ("XS", "S", "M", "L", "XL")
+
+
+def _fabric_mult(fabric: Optional[str]) -> float:
+    if not fabric:
+        return 0.0
+    hits = _FAB_RE.findall(fabric.lower())
+    if len(hits) == 1:
+        return _FAB_MULT[hits[0]]
+    if hits:
+        return _FAB_MULT[min(hits, key=_FAB_PRIORITY.__getitem__)]
+    return 0.0
+
+
+def _pattern_mult(pattern: Optional[str]) -> float:
+    return 0.1 if pattern and pattern.lower() in _PATTERN_SET else 0.0
+
+
+def _fit_mult(fit: Optional[str]) -> float:
+    return 0.05 if fit and fit.lower() in _FIT_SET else 0.0
+
+
+def _compute_multiplier(
+    result: Dict[str, Any],
+    default_fabric: Optional[str] = None,
+    default_fabric_mult: float = 0.0,
+    default_pattern: Optional[str] = None,
+    default_pattern_mult: float = 0.0,
+    default_fit: Optional[str] = None,
+    default_fit_mult: float = 0.0,
+) -> float:
+    # Fields still at the category default use the multiplier baked in at import
+    fabric, pattern, fit = result.get("fabric"), result.get("pattern"), result.get("fit")
+    multipliers = 1.0
+    multipliers += default_fabric_mult if fabric == default_fabric else _fabric_mult(fabric)
+    multipliers += default_pattern_mult if pattern == default_pattern else _pattern_mult(pattern)
+    multipliers += default_fit_mult if fit == default_fit else _fit_mult(fit)
+    return multipliers
+
+
+def _specialize_price_fn(defaults: Dict[str, str]):
+    return partial(
+        _compute_multiplier,
+        default_fabric=defaults.get("fabric"),
+        default_fabric_mult=_fabric_mult(defaults.get("fabric")),
+        default_pattern=defaults.get("pattern"),
+        default_pattern_mult=_pattern_mult(defaults.get("pattern")),
+        default_fit=defaults.get("fit"),
+        default_fit_mult=_fit_mult(defaults.get("fit")),
+    )
 
-def auto_complete_customization(cust: Customization, product: Optional[dict]) -> Dict[str, Any]:
-    # Simple rule engine to auto-complete choices
-    result = cust.model_dump()
-    category = cust.category
-
-    # Defaults based on category if missing
-    defaults = {
-        "suit": {"fit": "tailored", "fabric": "worsted wool", "color": "navy", "pattern": "solid"},
-        "boots": {"color": "oxblood", "fabric": "full-grain leather", "fit": "regular"},
-        "shoes": {"color": "chestnut", "fabric": "calf leather", "fit": "regular"},
-        "hat": {"color": "charcoal", "fabric": "felt", "pattern": "solid"},
-        "belt": {"color": "dark brown", "fabric": "leather"},
-        "shirt": {"color": "white", "fabric": "oxford", "fit": "slim"},
-        "trousers": {"color": "charcoal", "fabric": "wool", "fit": "classic"},
-    }
 
-    base = defaults.get(category, {})
+# Price multiplier function per category, specialized on that category's defaults
+_PRICE_FN = {cat: _specialize_price_fn(d) for cat, d in _DEFAULTS.items()}
+_GENERIC_PRICE_FN = _compute_multiplier
+
+
+@lru_cache(maxsize=1024)
+def _auto_complete_core(
+    category: str,
+    color: Optional[str],
+    fabric: Optional[str],
+    size: Optional[str],
+    fit: Optional[str],
+    pattern: Optional[str],
+    chest_cm: Optional[float],
+    base_price: float,
+    product_key: Optional[tuple],
+) -> tuple:
+    # Pure rule engine: returns the resolved option values (in _OPTION_KEYS order) and price
+    result = dict(zip(_OPTION_KEYS, (color, fabric, size, fit, pattern)))
+    base = _DEFAULTS.get(category, {})
 
     # Pull available options from product if provided
-    if product:
-        for key in ["color", "fabric", "size", "fit", "pattern"]:
-            if not result.get(key):
-                options = product.get(key + "s") if key + "s" in product else product.get(key)
-                if isinstance(options, list) and options:
-                    result[key] = options[0]
+    if product_key:
+        for key, first in zip(_OPTION_KEYS, product_key):
+            if not result[key] and first is not None:
+                result[key] = first
 
     # Apply defaults for any missing
     for k, v in base.items():
         result[k] = result.get(k) or v
 
     # Simple size inference
-    m = cust.measurements
-    if not result.get("size") and m and m.chest_cm:
-        if m.chest_cm < 90:
-            result["size"] = "XS"
-        elif m.chest_cm < 96:
-            result["size"] = "S"
-        elif m.chest_cm < 102:
-            result["size"] = "M"
-        elif m.chest_cm < 110:
-            result["size"] = "L"
-        else:
-            result["size"] = "XL"
+    if not result.get("size") and chest_cm:
+        result["size"] = _SIZES[bisect.bisect_right(_CHEST_CUTS, chest_cm)]
 
     # Estimate price
-    base_price = product.get("base_price", 300) if product else 300
-    multipliers = 1.0
-    if result.get("fabric"):
-        fab = result["fabric"].lower()
-        if "cashmere" in fab:
-            multipliers += 0.6
-        elif "wool" in fab:
-            multipliers += 0.25
-        elif "leather" in fab:
-            multipliers += 0.35
-        elif "linen" in fab:
-            multipliers += 0.15
-    if result.get("pattern") and result["pattern"].lower() in ["pinstripe", "herringbone", "houndstooth"]:
-        multipliers += 0.1
-    if result.get("fit") and result["fit"].lower() in ["tailored", "slim"]:
-        multipliers += 0.05
-
+    multipliers = _PRICE_FN.get(category, _GENERIC_PRICE_FN)(result)
     est_price = round(base_price * multipliers, 2)
 
+    return tuple(result[k] for k in _OPTION_KEYS), est_price
+
+
+def _product_key(product: dict) -> tuple:
+    # First usable option per key, which is all the rule engine reads from a product
+    key = []
+    for k in _OPTION_KEYS:
+        options = product.get(k + "s") if k + "s" in product else product.get(k)
+        key.append(options[0] if isinstance(options, list) and options else None)
+    return tuple(key)
+
+
+def _auto_complete_from_dict(
+    category: str,
+    meas: Optional[Measurement],
+    extras: Dict[str, Any],
+    product: Optional[dict],
+) -> Dict[str, Any]:
+    # Trusted internal entry point: extras holds any already-chosen Customization fields
+    result = {"category": category, **extras}
+    values, est_price = _auto_complete_core(
+        category,
+        extras.get("color"),
+        extras.get("fabric"),
+        extras.get("size"),
+        extras.get("fit"),
+        extras.get("pattern"),
+        meas.chest_cm if meas else None,
+        product.get("base_price", 300) if product else 300,
+        _product_key(product) if product else None,
+    )
+    result.update(zip(_OPTION_KEYS, values))
+
     return {"config": result, "est_price": est_price}
 
 
+def auto_complete_customization(cust: Customization, product: Optional[dict]) -> Dict[str, Any]:
+    # Simple rule engine to auto-complete choices
+    extras = cust.model_dump(exclude={"category"})
+    return _auto_complete_from_dict(cust.category, cust.measurements, extras, product)
+
+
 @app.post("/customize")
-def customize(cust: Customization):
+async def customize(cust: Customization):
     # Load product if provided
     product = None
-    if cust.product_id:
+    if cust.product_id and db is not None and ObjectId.is_valid(cust.product_id):
         try:
-            oid = ObjectId(cust.product_id)
-            product = db["product"].find_one({"_id": oid})
+            product = await db["product"].find_one({"_id": ObjectId(cust.product_id)})
             if product:
                 product["id"] = str(product.pop("_id"))
         except Exception:
@@ -157,62 +292,132 @@ def customize(cust: Customization):
 
 # ---------------------- Orders ----------------------
 @app.post("/orders")
-def create_order(order: Order):
+async def create_order(order: Order):
     try:
-        _id = create_document("order", order)
+        _id = await create_document_batched("order", order)
         return {"id": _id, "status": "received"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/orders")
-def list_orders(limit: int = 50):
+async def list_orders(limit: int = Query(50, ge=1)):
     try:
-        items = get_documents("order", {}, limit)
-        for it in items:
-            it["id"] = str(it.pop("_id")) if "_id" in it else None
+        items = await get_documents_with_id("order", {}, limit)
         return {"items": items}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # ---------------------- Recommendations ----------------------
+# Only the fields read by the ranking loop and auto_complete_customization
+_REC_PROJECTION = {
+    "_id": 1,
+    "title": 1,
+    "category": 1,
+    "base_price": 1,
+    "colors": 1,
+    "fabrics": 1,
+    "sizes": 1,
+    "fits": 1,
+    "patterns": 1,
+}
+# Recent responses keyed by request signature; cleared whenever a product is added
+_REC_CACHE: TTLCache = TTLCache(maxsize=512, ttl=60)
+
+
+# Products fetched per category when one chat message names several
+_PER_CATEGORY = 6
+
+
+def _interleave_by_category(groups: Dict[str, List[dict]]) -> List[dict]:
+    # Round-robin across categories so the ranking doesn't favour only one of them
+    return [p for tier in zip_longest(*groups.values()) for p in tier if p is not None]
+
+
+# Virtual suggestions used until products are seeded; their configs never change
+_SEED = [
+    {"title": "Savile Row Three-Piece Suit", "category": "suit", "base_price": 1200},
+    {"title": "Full-Grain Leather Boots", "category": "boots", "base_price": 380},
+    {"title": "Classic Oxford Shirt", "category": "shirt", "base_price": 120},
+]
+
+
+def _seed_rec(p: dict) -> Dict[str, Any]:
+    comp = _auto_complete_from_dict(p["category"], None, {}, p)
+    return {
+        "product_id": None,
+        "title": p["title"],
+        "category": p["category"],
+        "suggested_config": comp["config"],
+        "est_price": comp["est_price"],
+    }
+
+
+_SEED_RECS = [_seed_rec(p) for p in _SEED]
+
+
+def _rationale(req: RecommendationRequest) -> str:
+    rationale = "Balanced choice with premium materials"
+    if req.style and req.style.lower() in ["vintage", "classic"]:
+        rationale = "Vintage-forward aesthetic with timeless details"
+    if req.purpose and "wedding" in req.purpose.lower():
+        rationale = "Formal-appropriate with elevated finishing"
+    return rationale
+
+
 @app.post("/recommendations")
-def recommendations(req: RecommendationRequest):
+async def recommendations(req: RecommendationRequest):
+    key = (req.category, req.style, req.purpose, req.budget, tuple(req.colors or ()))
+    cached = _REC_CACHE.get(key)
+    if cached is not None:
+        return cached
+
     # Filter products by category or tags/colors if provided
     filt: Dict[str, Any] = {}
     if req.category:
         filt["category"] = req.category
-    products = get_documents("product", filt, 50)
+    data = await _rank_recommendations(req, filt)
+    _REC_CACHE[key] = data
+    return data
+
+
+async def _rank_recommendations(
+    req: RecommendationRequest,
+    filt: Optional[Dict[str, Any]] = None,
+    categories: Optional[List[str]] = None,
+):
+    if categories:
+        # Capped per category in the query so one large category can't crowd out the rest
+        groups = await get_documents_per_value("product", "category", categories, _PER_CATEGORY, _REC_PROJECTION)
+        products = _interleave_by_category(groups)
+    else:
+        products = await get_documents("product", filt, 50, _REC_PROJECTION)
+
+    rationale = _rationale(req)
 
-    # If no products seeded yet, provide virtual suggestions
+    # If no products seeded yet, serve the precomputed virtual suggestions
     if not products:
-        seed = [
-            {"title": "Savile Row Three-Piece Suit", "category": "suit", "base_price": 1200},
-            {"title": "Full-Grain Leather Boots", "category": "boots", "base_price": 380},
-            {"title": "Classic Oxford Shirt", "category": "shirt", "base_price": 120},
+        out = [
+            {**rec, "rationale": rationale}
+            for rec in _SEED_RECS
+            if not (req.budget and rec["est_price"] > req.budget * 1.2)
         ]
-        products = seed
+        return {"recommendations": out}
 
     # Basic ranking by budget/style
     out = []
     for p in products[:6]:
-        cust = Customization(category=p.get("category", req.category or "suit"))
-        comp = auto_complete_customization(cust, p)
+        comp = _auto_complete_from_dict(p.get("category") or req.category or "suit", None, {}, p)
         price = comp["est_price"]
         if req.budget and price > req.budget * 1.2:
             continue
-        rationale = "Balanced choice with premium materials"
-        if req.style and req.style.lower() in ["vintage", "classic"]:
-            rationale = "Vintage-forward aesthetic with timeless details"
-        if req.purpose and "wedding" in req.purpose.lower():
-            rationale = "Formal-appropriate with elevated finishing"
         out.append({
             "product_id": str(p.get("_id")) if p and p.get("_id") else None,
             "title": p.get("title"),
             "category": p.get("category"),
             "suggested_config": comp["config"],
-            "est_price": comp["est_price"],
+            "est_price": price,
             "rationale": rationale,
         })
         if len(out) >= 3:
@@ -222,43 +427,98 @@ def recommendations(req: RecommendationRequest):
 
 
 # ---------------------- Chat (rule-based) ----------------------
+_CAT_KEYWORDS = {
+    "suit": ["suit", "tux", "blazer"],
+    "boots": ["boot"],
+    "shoes": ["shoe", "oxford", "derby", "loafer"],
+    "hat": ["hat", "fedora", "trilby"],
+    "belt": ["belt"],
+    "shirt": ["shirt", "oxford"],
+    "trousers": ["trouser", "pant", "slacks"],
+}
+_CAT_ORDER = {k: i for i, k in enumerate(_CAT_KEYWORDS)}
+_PURPOSE_KEYWORDS = ["wedding", "business", "casual", "black tie"]
+
+
+def _build_keyword_intents() -> Dict[str, tuple]:
+    # Inverted keyword -> (kind, label) intents table, e.g. "tux" -> (("category", "suit"),)
+    table: Dict[str, List[tuple]] = {}
+    for cat, kws in _CAT_KEYWORDS.items():
+        for kw in kws:
+            table.setdefault(kw, []).append(("category", cat))
+    for kw in _PURPOSE_KEYWORDS:
+        table.setdefault(kw, []).append(("purpose", kw))
+    return {kw: tuple(intents) for kw, intents in table.items()}
+
+
+_KW2INTENTS = _build_keyword_intents()
+
+
+def _build_intent_automaton() -> ahocorasick.Automaton:
+    ac = ahocorasick.Automaton()
+    for kw, intents in _KW2INTENTS.items():
+        ac.add_word(kw, (kw, intents))
+    ac.make_automaton()
+    return ac
+
+
+_INTENT_AC = _build_intent_automaton()
+
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    # Allow a trailing plural "s" so "boots" and "shirts" still count
+    if start > 0 and text[start - 1].isalnum():
+        return False
+    if end < len(text) and text[end] == "s":
+        end += 1
+    return end >= len(text) or not text[end].isalnum()
+
+
 @app.post("/chat")
-def chat(req: ChatRequest):
+async def chat(req: ChatRequest):
     # Very simple rule-based assistant to guide selection
     user_texts = [m.content for m in req.messages if m.role == "user"]
     last = (user_texts[-1] if user_texts else "").lower()
 
-    # Detect category intent
-    cat_map = {
-        "suit": ["suit", "tux", "blazer"],
-        "boots": ["boot"],
-        "shoes": ["shoe", "oxford", "derby", "loafer"],
-        "hat": ["hat", "fedora", "trilby"],
-        "belt": ["belt"],
-        "shirt": ["shirt", "oxford"],
-        "trousers": ["trouser", "pant", "slacks"],
-    }
-    chosen = None
-    for k, kws in cat_map.items():
-        if any(w in last for w in kws):
-            chosen = k
-            break
-
-    if chosen:
-        rec = recommendations(RecommendationRequest(category=chosen, style="vintage"))
-        msg = f"I recommend these {chosen} options. Would you like me to tailor the fit and fabric to your climate and occasion?"
+    # Detect category and purpose intent in a single pass over the text
+    cats = set()
+    word_cats = set()
+    purposes = set()
+    for end, (kw, intents) in _INTENT_AC.iter(last):
+        kw_cats = [label for kind, label in intents if kind == "category"]
+        purposes.update(label for kind, label in intents if kind == "purpose")
+        cats.update(kw_cats)
+        # Only unambiguous whole words ("hat", not "what"; not "oxford") can add a second category
+        if len(kw_cats) == 1 and _is_whole_word(last, end - len(kw) + 1, end + 1):
+            word_cats.add(kw_cats[0])
+
+    if cats:
+        primary = min(cats, key=_CAT_ORDER.__getitem__)
+        chosen = sorted(word_cats, key=_CAT_ORDER.__getitem__) if len(word_cats) > 1 else [primary]
+        rec_req = RecommendationRequest(category=chosen[0], style="vintage")
+        if len(chosen) == 1:
+            rec = await recommendations(rec_req)
+        else:
+            # One merged query across every detected category, balanced per category
+            rec = await _rank_recommendations(rec_req, categories=chosen)
+        msg = f"I recommend these {' and '.join(chosen)} options. Would you like me to tailor the fit and fabric to your climate and occasion?"
         return {"reply": msg, "data": rec}
 
-    if any(w in last for w in ["wedding", "business", "casual", "black tie"]):
-        purpose = "wedding" if "wedding" in last else ("business" if "business" in last else "casual")
-        rec = recommendations(RecommendationRequest(purpose=purpose, style="classic"))
+    if purposes:
+        purpose = "wedding" if "wedding" in purposes else ("business" if "business" in purposes else "casual")
+        rec = await recommendations(RecommendationRequest(purpose=purpose, style="classic"))
         return {"reply": f"Here are refined picks for {purpose}.", "data": rec}
 
     return {"reply": "Tell me what you're looking for (e.g., a navy suit for a wedding, leather boots for winter). I'll recommend configs and pricing.", "data": {}}
 
 
+# /test doubles as a health probe, so only list collections every 30 seconds
+_COLL_CACHE_TTL = 30
+_COLL_CACHE: Dict[str, Any] = {"t": float("-inf"), "v": []}
+
+
 @app.get("/test")
-def test_database():
+async def test_database():
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -274,7 +534,11 @@ def test_database():
             response["database_name"] = db.name if hasattr(db, 'name') else "✅ Connected"
             response["connection_status"] = "Connected"
             try:
-                collections = db.list_collection_names()
+                now = time.monotonic()
+                if now - _COLL_CACHE["t"] > _COLL_CACHE_TTL:
+                    _COLL_CACHE["v"] = await db.list_collection_names()
+                    _COLL_CACHE["t"] = now
+                collections = _COLL_CACHE["v"]
                 response["collections"] = collections[:10]
                 response["database"] = "✅ Connected & Working"
             except Exception as e:
@@ -286,6 +550,7 @@ def test_database():
 
     response["database_url"] = "✅ Set" if os.getenv("DATABASE_URL") else "❌ Not Set"
     response["database_name"] = "✅ Set" if os.getenv("DATABASE_NAME") else "❌ Not Set"
+    response["indexes"] = _INDEX_STATUS["status"]
     return response
 
 
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+import database
+
+
+class FakeCollection:
+    def __init__(self, fail_indexes=(), hang=False, gate=None):
+        self.calls = []
+        self.fail_indexes = fail_indexes
+        self.hang = hang
+        self.gate = gate
+
+    async def insert_many(self, docs, ordered=True):
+        self.calls.append(list(docs))
+        if self.hang:
+            await asyncio.Event().wait()
+        if self.gate is not None:
+            await self.gate.wait()
+        for doc in docs:
+            doc.setdefault("_id", ObjectId())
+        if self.fail_indexes:
+            raise BulkWriteError({
+                "writeErrors": [{"index": i, "errmsg": "duplicate key"} for i in self.fail_indexes],
+            })
+
+
+class FakeDB(dict):
+    def __missing__(self, name):
+        coll = self[name] = FakeCollection()
+        return coll
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    fake = FakeDB()
+    monkeypatch.setattr(database, "db", fake)
+    monkeypatch.setattr(database, "_batch_writers", {})
+    return fake
+
+
+def test_concurrent_inserts_share_one_insert_many(fake_db):
+    async def run():
+        return await asyncio.gather(*(
+            database.create_document_batched("order", {"n": i}) for i in range(5)
+        ))
+
+    ids = asyncio.run(run())
+
+    assert len(fake_db["order"].calls) == 1
+    assert [doc["n"] for doc in fake_db["order"].calls[0]] == list(range(5))
+    assert len(set(ids)) == 5 and all(ObjectId.is_valid(i) for i in ids)
+
+
+def test_partial_bulk_write_error_only_fails_that_document(fake_db):
+    fake_db["order"] = FakeCollection(fail_indexes=(1,))
+
+    async def run():
+        return await asyncio.gather(
+            *(database.create_document_batched("order", {"n": i}) for i in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+
+    assert ObjectId.is_valid(results[0]) and ObjectId.is_valid(results[2])
+    assert isinstance(results[1], Exception) and "duplicate key" in str(results[1])
+
+
+def test_worker_restarts_on_a_new_event_loop(fake_db):
+    first = asyncio.run(database.create_document_batched("order", {"n": 1}))
+    second = asyncio.run(database.create_document_batched("order", {"n": 2}))
+
+    assert first != second
+    assert len(fake_db["order"].calls) == 2
+
+
+def test_worker_restarts_after_it_stops(fake_db):
+    async def run():
+        await database.create_document_batched("order", {"n": 1})
+        _, _, task = database._batch_writers["order"]
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return await database.create_document_batched("order", {"n": 2})
+
+    assert ObjectId.is_valid(asyncio.run(run()))
+    assert len(fake_db["order"].calls) == 2
+
+
+def test_insert_times_out_instead_of_hanging(fake_db, monkeypatch):
+    fake_db["order"] = FakeCollection(hang=True)
+    monkeypatch.setattr(database, "_BATCH_RESULT_TIMEOUT_S", 0.05)
+
+    async def run():
+        with pytest.raises(Exception, match="Timed out"):
+            await database.create_document_batched("order", {"n": 1})
+        await database.stop_batch_writers()
+
+    asyncio.run(run())
+
+
+def test_timed_out_queued_insert_is_never_written(fake_db, monkeypatch):
+    monkeypatch.setattr(database, "_BATCH_RESULT_TIMEOUT_S", 0.05)
+
+    async def run():
+        gate = asyncio.Event()
+        fake_db["order"] = FakeCollection(gate=gate)
+        # The first insert is in flight and blocked, so the second one waits in the queue
+        in_flight = asyncio.ensure_future(database.create_document_batched("order", {"n": 1}))
+        await asyncio.sleep(database._BATCH_WINDOW_S * 3)
+        with pytest.raises(Exception, match="Timed out"):
+            await database.create_document_batched("order", {"n": 2})
+        gate.set()
+        await asyncio.gather(in_flight, return_exceptions=True)
+        await asyncio.sleep(database._BATCH_WINDOW_S * 3)
+        await database.stop_batch_writers()
+
+    asyncio.run(run())
+
+    assert [[doc["n"] for doc in call] for call in fake_db["order"].calls] == [[1]]
+
+
+def test_stop_batch_writers_cancels_workers(fake_db):
+    async def run():
+        await database.create_document_batched("order", {"n": 1})
+        _, _, task = database._batch_writers["order"]
+        await database.stop_batch_writers()
+        return task
+
+    task = asyncio.run(run())
+
+    assert task.cancelled()
+    assert database._batch_writers == {}
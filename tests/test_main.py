@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+import database
+import main
+from schemas import ChatMessage, ChatRequest
+
+
+def _matches(doc, query):
+    for field, cond in query.items():
+        if isinstance(cond, dict) and "$in" in cond:
+            if doc.get(field) not in cond["$in"]:
+                return False
+        elif doc.get(field) != cond:
+            return False
+    return True
+
+
+def _run_pipeline(docs, pipeline):
+    for stage in pipeline:
+        (op, arg), = stage.items()
+        if op == "$match":
+            docs = [d for d in docs if _matches(d, arg)]
+        elif op == "$limit":
+            docs = docs[:arg]
+        elif op == "$project":
+            docs = [{k: v for k, v in d.items() if arg.get(k)} for d in docs]
+        elif op == "$facet":
+            docs = [{name: _run_pipeline(docs, sub) for name, sub in arg.items()}]
+        else:
+            raise AssertionError(f"unsupported stage {op}")
+    return docs
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return self.docs[:length] if length else self.docs
+
+
+class FakeCatalog:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def aggregate(self, pipeline):
+        return FakeCursor(_run_pipeline(self.docs, pipeline))
+
+
+@pytest.fixture
+def skewed_catalog(monkeypatch):
+    # Sixty suits stored ahead of the only pair of trousers
+    docs = [
+        {"_id": ObjectId(), "title": f"Suit {i}", "category": "suit", "base_price": 500}
+        for i in range(60)
+    ]
+    docs.append({"_id": ObjectId(), "title": "Flannel Trousers", "category": "trousers", "base_price": 200})
+    monkeypatch.setattr(database, "db", {"product": FakeCatalog(docs)})
+
+
+def test_chat_multi_category_picks_cover_each_category(skewed_catalog):
+    req = ChatRequest(messages=[ChatMessage(role="user", content="a suit and trousers")])
+
+    res = asyncio.run(main.chat(req))
+
+    assert "suit and trousers" in res["reply"]
+    cats = [r["category"] for r in res["data"]["recommendations"]]
+    assert "suit" in cats and "trousers" in cats
+
+
+class FailingIndexes:
+    async def create_index(self, key):
+        raise Exception("not authorized on shop to execute command")
+
+
+def test_index_build_failure_is_reported_by_test_endpoint(monkeypatch):
+    monkeypatch.setattr(main, "db", {"product": FailingIndexes(), "order": FailingIndexes()})
+    monkeypatch.setitem(main._INDEX_STATUS, "status", "Not Created")
+
+    asyncio.run(main.create_indexes())
+
+    assert "not authorized" in asyncio.run(main.test_database())["indexes"]